@@ -0,0 +1,183 @@
+##############################################################################
+#  Copyright (c) 2018 by Paul Scherrer Institute, Switzerland
+#  All rights reserved.
+#  Authors: Oliver Bruendler
+##############################################################################
+
+########################################################################################################################
+# Import Statements
+########################################################################################################################
+import os
+import re
+import json
+from typing import List
+from . import ProjectFiles
+
+########################################################################################################################
+# Class Defintion
+########################################################################################################################
+class Artifact:
+    """
+    This class represents one file produced by a build step. The SHA-256 hash is only calculated when it is accessed
+    for the first time, so creating manifests of large netlists and bitstreams is cheap.
+    """
+
+    def __init__(self, path : str, size : int, timestamp : float, sha256 : str = None):
+        """
+        Constructor
+
+        :param path: Absolute path of the file
+        :param size: Size of the file in bytes
+        :param timestamp: Modification time of the file in seconds since the epoch
+        :param sha256: SHA-256 hash of the file content (optional, calculated on first access if not given)
+        """
+        self.path = path
+        self.size = size
+        self.timestamp = timestamp
+        self._sha256 = sha256
+
+    @classmethod
+    def FromFile(cls, path : str) -> "Artifact":
+        """
+        Create an artifact from an existing file (the hash is not calculated yet)
+
+        :param path: Path of the file
+        :return: Artifact object
+        """
+        path = os.path.abspath(path).replace("\\", "/")
+        stat = os.stat(path)
+        return cls(path, stat.st_size, stat.st_mtime)
+
+    @property
+    def sha256(self) -> str:
+        """
+        Get the SHA-256 hash of the file content (calculated on first access)
+        """
+        if self._sha256 is None:
+            self._sha256 = ProjectFiles.HashFile(self.path)
+        return self._sha256
+
+
+class ArtifactManifest:
+    """
+    This class contains the files produced by a build step. It is returned by the build wrappers (e.g.
+    Ise.BuildProject(), Edk.CleanBuild()), which add the output files the flow is known to produce (no directory
+    scans). Later steps can look up artifacts in the manifest instead of searching directories with wildcards (and
+    without picking up stale files from earlier builds).
+    """
+
+    ####################################################################################################################
+    # Public Methods
+    ####################################################################################################################
+    def __init__(self, artifacts : List[Artifact] = None):
+        """
+        Constructor
+
+        :param artifacts: Artifacts contained in the manifest (optional)
+        """
+        self._artifacts = {}
+        for artifact in artifacts or []:
+            self._artifacts[artifact.path] = artifact
+
+    @classmethod
+    def FromFiles(cls, paths : List[str]) -> "ArtifactManifest":
+        """
+        Create a manifest from a list of expected output files. Files that do not exist are ignored.
+
+        :param paths: Paths of the files
+        :return: Manifest containing all existing files
+        """
+        manifest = cls()
+        for path in paths:
+            if os.path.isfile(path):
+                manifest.Add(path)
+        return manifest
+
+    def Add(self, path : str) -> Artifact:
+        """
+        Add a file to the manifest
+
+        :param path: Path of the file
+        :return: Artifact object added
+        """
+        artifact = Artifact.FromFile(path)
+        self._artifacts[artifact.path] = artifact
+        return artifact
+
+    def Merge(self, other : "ArtifactManifest"):
+        """
+        Add all artifacts of another manifest
+
+        :param other: Manifest to merge into this one
+        """
+        self._artifacts.update(other._artifacts)
+
+    def Find(self, pattern : str) -> List[Artifact]:
+        """
+        Find artifacts by file name
+
+        :param pattern: Regex the file name (without directory) must match completely
+        :return: List of matching artifacts
+        """
+        return [a for a in self._artifacts.values() if re.fullmatch(pattern, os.path.basename(a.path)) is not None]
+
+    def Get(self, pattern : str) -> Artifact:
+        """
+        Get exactly one artifact by file name. An exception is raised if no or multiple artifacts match.
+
+        :param pattern: Regex the file name (without directory) must match completely
+        :return: Matching artifact
+        """
+        matches = self.Find(pattern)
+        if len(matches) != 1:
+            raise Exception("Expected one artifact matching {}, found {}: {}".format(
+                            pattern, len(matches), ", ".join(a.path for a in matches)))
+        return matches[0]
+
+    def IsUnchanged(self) -> bool:
+        """
+        Check if all artifacts still exist with the recorded size and timestamp (and hash, if it was calculated)
+
+        :return: True if no artifact was modified or deleted
+        """
+        for artifact in self._artifacts.values():
+            if not os.path.isfile(artifact.path):
+                return False
+            current = Artifact.FromFile(artifact.path)
+            if current.size != artifact.size or current.timestamp != artifact.timestamp:
+                return False
+            if artifact._sha256 is not None and current.sha256 != artifact._sha256:
+                return False
+        return True
+
+    def Save(self, path : str):
+        """
+        Write the manifest into a JSON file. Hashes are only written if they were calculated before.
+
+        :param path: Path of the JSON file
+        """
+        artifacts = [{"path" : a.path, "size" : a.size, "timestamp" : a.timestamp, "sha256" : a._sha256}
+                     for a in sorted(self._artifacts.values(), key=lambda a: a.path)]
+        with open(path, "w+") as f:
+            json.dump(artifacts, f, indent=4)
+
+    @classmethod
+    def Load(cls, path : str) -> "ArtifactManifest":
+        """
+        Read a manifest written by Save()
+
+        :param path: Path of the JSON file
+        :return: Manifest object
+        """
+        with open(path) as f:
+            return cls([Artifact(**a) for a in json.load(f)])
+
+    ####################################################################################################################
+    # Public Properties
+    ####################################################################################################################
+    @property
+    def Artifacts(self) -> List[Artifact]:
+        """
+        Get all artifacts of the manifest
+        """
+        return list(self._artifacts.values())
@@ -8,12 +8,17 @@
 # Import Statements
 ########################################################################################################################
 import sys
-from PsiPyUtils.FileOperations import RemoveWithWildcard, OpenWithWildcard, AbsPathLinuxStyle
+from PsiPyUtils.FileOperations import RemoveWithWildcard, AbsPathLinuxStyle
 from PsiPyUtils import TempFile
 from PsiPyUtils import TempWorkDir
 from PsiPyUtils.EnvVariables import AddToPathVariable
 from PsiPyUtils import ExtAppCall
+from .LogArchive import LogArchive
+from .NetlistCache import NetlistCache
+from .ArtifactManifest import ArtifactManifest
+from . import ProjectFiles
 import os
+import re
 
 
 ########################################################################################################################
@@ -54,13 +59,22 @@ class Edk:
             raise Exception("OS {} not supported".format(sys.platform))
 
 
-    def CleanBuild(self, xmpPath : str, logFile : str, buildTimeoutSec : int = 3600):
+    def CleanBuild(self, xmpPath : str, logFile : str, buildTimeoutSec : int = 3600, logArchive : LogArchive = None,
+                   netlistCache : NetlistCache = None) -> ArtifactManifest:
         """
         Clean EDK project and build it
 
+        If a netlist cache is passed, the implementation directory is pre-populated with the cached pcore netlists
+        after netlistclean, so XPS does not synthesize these pcores again. The hit/miss statistics are available
+        through netlistCache.Hits and netlistCache.Misses afterwards. After a successful build, all pcore netlists
+        not yet in the cache are added to it.
+
         :param xmpPath: Path of the .xmp file to build
         :param logFile: File to write EDK output into
         :param buildTimeoutSec: Timeout for bitstream generation
+        :param logArchive: Write the log compressed into this archive instead of writing it to logFile (optional)
+        :param netlistCache: Cache for synthesized pcore netlists shared between projects (optional)
+        :return: Manifest of the implementation files produced (bitstream, BMM, netlists and reports of the system)
         """
         #Reset timing score to ensure it is not 0 after an abortted build
         self._timingScore = None
@@ -68,11 +82,33 @@ class Edk:
         logFileAbs = os.path.abspath(logFile)
         prjPath = AbsPathLinuxStyle(os.path.dirname(xmpPath))
         prjName = os.path.basename(xmpPath)
+        cleanStdout = ""
         with TempWorkDir(prjPath):
+            #Clean separately, so cached netlists can be copied into the project before building
+            if netlistCache is not None:
+                with TempFile("__edk.tcl") as tcl:
+                    tcl.write("xload xmp {}\n".format(prjName))
+                    tcl.write("run netlistclean\n")
+                    tcl.write("exit\n")
+                    tcl.flush()
+                    call = ExtAppCall(".", "xps -nw -scr __edk.tcl")
+                    call.run_sync(timeout_sec=120)
+                    cleanStdout = call.get_stdout()
+                    #Write the log before raising, otherwise the XPS output of a failed clean is lost
+                    if call.get_exit_code() != 0:
+                        self._WriteLog(logFileAbs, logArchive, cleanStdout)
+                        raise Exception("EDK netlistclean exitetd with Non-Zero return code")
+                    if "ERROR:" in cleanStdout:
+                        self._WriteLog(logFileAbs, logArchive, cleanStdout)
+                        raise Exception("Errors occured. See log file for details.")
+                netlistCache.Populate(prjName, self._version)
+                cleanStdout += "\nNetlist cache: {} hits, {} misses\n".format(len(netlistCache.Hits),
+                                                                            len(netlistCache.Misses))
             with TempFile("__edk.tcl") as tcl:
                 #Write TCL file
                 tcl.write("xload xmp {}\n".format(prjName))
-                tcl.write("run netlistclean\n")
+                if netlistCache is None:
+                    tcl.write("run netlistclean\n")
                 tcl.write("run bits\n")
                 tcl.write("exit\n")
                 tcl.flush()
@@ -80,8 +116,7 @@ class Edk:
                 #Call ISE TCL shell
                 call = ExtAppCall(".", "xps -nw -scr __edk.tcl")
                 call.run_sync(timeout_sec=buildTimeoutSec)
-                with open(logFileAbs, "w+") as f:
-                    f.write(call.get_stdout())
+                self._WriteLog(logFileAbs, logArchive, cleanStdout + call.get_stdout())
                 #Checks
                 if call.get_exit_code() != 0:
                     raise Exception("EDK build exitetd with Non-Zero return code")
@@ -92,23 +127,36 @@ class Edk:
                 if "Bitstream generation is complete." not in call.get_stdout():
                     raise Exception("Bitstream was not generated")
 
+            #Add new netlists to the cache
+            if netlistCache is not None:
+                netlistCache.Store(prjName, self._version)
+
+        #Implementation files are named after the MHS file
+        xmp = ProjectFiles.ParseXmp(xmpPath)
+        systemName = os.path.splitext(os.path.basename(xmp["MHS File"]))[0]
+        manifest = ArtifactManifest.FromFiles(["{}/implementation/{}{}".format(prjPath, systemName, ext)
+                                               for ext in (".bit", "_bd.bmm", ".ngc", ".ngd", "_map.ncd", "_map.mrp",
+                                                           ".pcf", ".ncd", ".par", ".twr")])
 
         #Check Timing
-        implDir = os.path.dirname(xmpPath) + "/implementation"
-        with OpenWithWildcard(implDir, ".*\.twr") as f:
+        with open(manifest.Get(re.escape(systemName + ".twr")).path) as f:
             content = f.read()
         summaryToEnd = content.split("Timing summary:")[1]
         scoreToEnd = summaryToEnd.split("Score:")[1]
         scoreNr = scoreToEnd.split("(")[0]
         self._timingScore = int(scoreNr.strip())
+        return manifest
 
-    def ExportHw(self, xmpPath : str, exportDir : str, logFile : str):
+    def ExportHw(self, xmpPath : str, exportDir : str, logFile : str,
+                 logArchive : LogArchive = None) -> ArtifactManifest:
         """
         Export HW to SDK
 
         :param xmpPath: Path of the .xmp file of the project to export
         :param exportDir: Export directory (the code is exported to <exportDir>/hw)
         :param logFile: Path of the log-file containing all EDK output
+        :param logArchive: Write the log compressed into this archive instead of writing it to logFile (optional)
+        :return: Manifest of the files exported (e.g. to be passed to Sdk.CreateNewWs())
         """
 
         #name-prefix
@@ -139,14 +187,19 @@ class Edk:
                 call = ExtAppCall(".", "xps -nw -scr __edk.tcl")
                 call.run_sync(timeout_sec=120)
                 #os.system(call.command)
-                with open(logFileAbs, "w+") as f:
-                    f.write(call.get_stdout())
+                if logArchive is not None:
+                    logArchive.Write(os.path.basename(logFileAbs), call.get_stdout())
+                else:
+                    with open(logFileAbs, "w+") as f:
+                        f.write(call.get_stdout())
                 # Checks
                 if call.get_exit_code() != 0:
                     raise Exception("EDK Export exitetd with Non-Zero return code")
                 # StdErr cannot be checked since it always contains some entries. So we check stdout for errors
                 if "ERROR:" in call.get_stdout():
                     raise Exception("Errors occured. See log file for details.")
+        return ArtifactManifest.FromFiles(["{}/hw/{}{}".format(exportAbs, xmpFileName, ext)
+                                           for ext in (".xml", ".bit", "_bd.bmm", ".html")])
 
     ####################################################################################################################
     # Public Properties
@@ -161,6 +214,14 @@ class Edk:
     ####################################################################################################################
     # Private Methods
     ####################################################################################################################
+    @staticmethod
+    def _WriteLog(logFileAbs : str, logArchive : LogArchive, content : str):
+        if logArchive is not None:
+            logArchive.Write(os.path.basename(logFileAbs), content)
+        else:
+            with open(logFileAbs, "w+") as f:
+                f.write(content)
+
     @staticmethod
     def _ExecutePexpect(obj, command : str, expOut : str, timeout : int, file) -> str:
         """
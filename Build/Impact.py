@@ -15,6 +15,7 @@ import os
 ########################################################################################################################
 from PsiPyUtils.EnvVariables import AddToPathVariable
 from PsiPyUtils import ExtAppCall
+from .LogArchive import LogArchive
 
 class Impact:
     """
@@ -48,7 +49,7 @@ class Impact:
         else:
             raise Exception("OS {} not supported".format(sys.platform))
 
-    def ExecBatch(self, batchName : str, buildTimeoutSec : int = 360):
+    def ExecBatch(self, batchName : str, buildTimeoutSec : int = 360, logArchive : LogArchive = None):
         """
         Run Impact in batch mode. 
         The batch file can do whatever, e.g. ACE or PROM file generation
@@ -56,6 +57,7 @@ class Impact:
         :param batchName: Path to the batch file for Impact
         :param logFile: File to write Impact output into
         :param buildTimeoutSec: Timeout for batch execution
+        :param logArchive: Write the log compressed into this archive instead of writing it to <batchName>.log (optional)
         """
         # Command line syntax for Impact batch mode
         # impact.exe -batch <batch_file>
@@ -65,8 +67,11 @@ class Impact:
         batchFile = os.path.basename(batchName)
         call = ExtAppCall(batchFolder, "impact -batch "+batchFile)
         call.run_sync(timeout_sec=buildTimeoutSec)
-        with open(logFileAbs, "w+") as f:
-            f.write(call.get_stdout())
+        if logArchive is not None:
+            logArchive.Write(os.path.basename(logFileAbs), call.get_stdout())
+        else:
+            with open(logFileAbs, "w+") as f:
+                f.write(call.get_stdout())
         #Checks
         if call.get_exit_code() != 0:
             raise Exception("Impact exitetd with Non-Zero return code")
@@ -8,12 +8,17 @@
 # Import Statements
 ########################################################################################################################
 import os
+import re
 import sys
+import shutil
 from PsiPyUtils.EnvVariables import AddToPathVariable
-from PsiPyUtils.FileOperations import OpenWithWildcard, AbsPathLinuxStyle
+from PsiPyUtils.FileOperations import AbsPathLinuxStyle
 from PsiPyUtils import TempFile
 from PsiPyUtils import TempWorkDir
 from PsiPyUtils import ExtAppCall
+from .LogArchive import LogArchive
+from .ArtifactManifest import ArtifactManifest
+from . import ProjectFiles
 
 ########################################################################################################################
 # Class Defintion
@@ -40,6 +45,8 @@ class Ise:
         self._version = version
         self._isePath = os.environ[isePathEnv].replace('"', '')
         self._timingScore = None
+        self._guided = False
+        self._guidedPercent = None
         if sys.platform.startswith("win"):
             AddToPathVariable("XILINX", "{}/ISE_DS/ISE".format(self._isePath))
             AddToPathVariable("PATH",   "{}/ISE_DS/ISE/bin/nt64".format(self._isePath))
@@ -52,53 +59,72 @@ class Ise:
 
 
     ####################################################################################################################
-    # Public Properties
+    # Public Methods
     ####################################################################################################################
-    def BuildProject(self, xisePath : str, logFile : str, buildTimeoutSec : int = 60*45):
+    def BuildProject(self, xisePath : str, logFile : str, buildTimeoutSec : int = 60*45, guided : bool = False,
+                     logArchive : LogArchive = None) -> ArtifactManifest:
         """
         Build the complete project and generate programming file
 
+        In guided mode, the routed NCD of the last successful build of the project is used as SmartGuide file for
+        map and PAR. If no guide file exists yet, a normal build is executed. If the guided build fails, the build is
+        repeated automatically without guide (the log of the guided attempt is kept as <logFile>.guided). After each
+        successful build that meets timing (timing score 0) the routed NCD is stored in <projectDir>/smartguide to be
+        used as guide for the next run.
+
         :param xisePath: Path of the .xise file to build
         :param logFile: File to write ISE output into
         :param buildTimeoutSec: Timeout for bitstream generation
+        :param guided: Use the results of the last successful build as SmartGuide file (optional, default is False)
+        :param logArchive: Write the log compressed into this archive instead of writing it to logFile (optional)
+        :return: Manifest of the implementation files produced (named after the top level module of the project)
         """
         #Reset timing score to ensure it is not 0 after an abortted build
         self._timingScore = None
+        self._guided = False
+        self._guidedPercent = None
         #Build
         logFileAbs = os.path.abspath(logFile)
         prjPath = AbsPathLinuxStyle(os.path.dirname(xisePath))
         prjName = os.path.basename(xisePath)
         with TempWorkDir(prjPath):
-            with TempFile("__ise.tcl") as tcl:
-                #Write TCL file
-                tcl.write("project open {}\n".format(prjName))
-                tcl.write("set result [ process run \"Generate Programming File\" -force rerun_all ]\n")
-                tcl.write("exit\n")
-                tcl.flush()
-
-                #Call ISE TCL shell
-                call = ExtAppCall(".", "xtclsh __ise.tcl")
-                call.run_sync()
-                with open(logFileAbs, "w+") as f:
-                    f.write(call.get_stdout())
-                #Checks
-                if call.get_exit_code() != 0:
-                    raise Exception("XTCLSH exitetd with Non-Zero return code")
-                #StdErr cannot be checked since it always contains some entries. So we check stdout for errors
-                if "ERROR:" in call.get_stdout():
-                    raise Exception("Errors occured. See log file for details.")
-                #Ensure that bitstream generation succeeded (to prevent silent-crashes from staying undetected)
-                if "Process \"Generate Programming File\" completed successfully" not in call.get_stdout():
-                    raise Exception("Bitstream was not generated")
+            guideFile = self._GuideFilePath(prjName)
+            if guided and os.path.isfile(guideFile):
+                #Remove the log of an earlier build, so a stale log is never kept as log of the guided attempt
+                if logArchive is None and os.path.isfile(logFileAbs):
+                    os.remove(logFileAbs)
+                try:
+                    self._RunBuild(prjName, logFileAbs, logArchive, guideFile)
+                    self._guided = True
+                except Exception:
+                    #Guiding failed, fall back to a full implementation run (the guided attempt may have failed
+                    #before writing a log)
+                    if logArchive is None and os.path.isfile(logFileAbs):
+                        shutil.copyfile(logFileAbs, logFileAbs + ".guided")
+                    self._RunBuild(prjName, logFileAbs, logArchive)
+            else:
+                self._RunBuild(prjName, logFileAbs, logArchive)
+            baseName = self._OutputBaseName(prjName)
+            manifest = ArtifactManifest.FromFiles(self._OutputFiles(baseName))
 
             #Check Timing
-            with OpenWithWildcard(".", ".*\.twr") as f:
+            with open(manifest.Get(re.escape(baseName + ".twr")).path) as f:
                 content = f.read()
             summaryToEnd = content.split("Timing summary:")[1]
             scoreToEnd = summaryToEnd.split("Score:")[1]
             scoreNr = scoreToEnd.split("(")[0]
             self._timingScore = int(scoreNr.strip())
 
+            #Check how much of the design was preserved
+            if self._guided:
+                self._guidedPercent = self._ParseGuideReport(manifest, baseName)
+
+            #Keep results as guide for the next run (only if timing is met, guiding from a failing result would
+            #preserve the failing placement and routing)
+            if self._timingScore == 0:
+                self._StoreGuideFile(manifest, baseName, guideFile)
+        return manifest
+
     ####################################################################################################################
     # Public Properties
     ####################################################################################################################
@@ -109,3 +135,111 @@ class Ise:
         """
         return self._timingScore
 
+    @property
+    def Guided(self):
+        """
+        True if the last build was implemented using SmartGuide (False for full runs and for guided builds that fell
+        back to a full run).
+        """
+        return self._guided
+
+    @property
+    def GuidedPercent(self):
+        """
+        Get the percentage of the design (components and nets) that was preserved from the guide file by the last
+        guided build. The value is a dictionary in the form {"Components" : 98.0, "Nets" : 95.0}. Returns None if the
+        last build was not guided or the guide report is not available.
+        """
+        return self._guidedPercent
+
+    ####################################################################################################################
+    # Private Methods
+    ####################################################################################################################
+    def _RunBuild(self, prjName : str, logFileAbs : str, logArchive : LogArchive = None, guideFile : str = None):
+        """
+        Run the ISE flow up to the programming file (working directory must be the project directory)
+
+        :param prjName: File name of the .xise file
+        :param logFileAbs: Absolute path of the log file
+        :param logArchive: Archive to write the log into instead of the log file (optional)
+        :param guideFile: SmartGuide file to use (optional, None for a full run)
+        """
+        with TempFile("__ise.tcl") as tcl:
+            #Write TCL file
+            tcl.write("project open {}\n".format(prjName))
+            if guideFile is not None:
+                tcl.write("project set \"Use Smart Guide\" true\n")
+                tcl.write("project set \"SmartGuide Filename\" \"{}\"\n".format(AbsPathLinuxStyle(guideFile)))
+            else:
+                tcl.write("project set \"Use Smart Guide\" false\n")
+            tcl.write("set result [ process run \"Generate Programming File\" -force rerun_all ]\n")
+            #Do not leave the project in guided mode
+            if guideFile is not None:
+                tcl.write("project set \"Use Smart Guide\" false\n")
+            tcl.write("project close\n")
+            tcl.write("exit\n")
+            tcl.flush()
+
+            #Call ISE TCL shell
+            call = ExtAppCall(".", "xtclsh __ise.tcl")
+            call.run_sync()
+            if logArchive is not None:
+                logArchive.Write(os.path.basename(logFileAbs), call.get_stdout())
+            else:
+                with open(logFileAbs, "w+") as f:
+                    f.write(call.get_stdout())
+            #Checks
+            if call.get_exit_code() != 0:
+                raise Exception("XTCLSH exitetd with Non-Zero return code")
+            #StdErr cannot be checked since it always contains some entries. So we check stdout for errors
+            if "ERROR:" in call.get_stdout():
+                raise Exception("Errors occured. See log file for details.")
+            #Ensure that bitstream generation succeeded (to prevent silent-crashes from staying undetected)
+            if "Process \"Generate Programming File\" completed successfully" not in call.get_stdout():
+                raise Exception("Bitstream was not generated")
+
+    @staticmethod
+    def _GuideFilePath(prjName : str) -> str:
+        return "smartguide/{}.ncd".format(prjName.split(".")[0])
+
+    @staticmethod
+    def _OutputBaseName(prjName : str) -> str:
+        #All implementation files are named after the XST output file, which defaults to the top level module name
+        properties = ProjectFiles.ParseXiseProperties(prjName)
+        if properties.get("Output File Name", "") != "":
+            return properties["Output File Name"]
+        return ProjectFiles.GetXiseTopName(prjName, properties)
+
+    def _OutputFiles(self, baseName : str) -> list:
+        #Files written by XST, NGDBuild, MAP, PAR, TRCE and BitGen
+        files = [baseName + ext for ext in (".ngc", ".syr", ".ngd", "_map.ncd", "_map.mrp", ".pcf", ".ncd", ".par",
+                                       ".twr", ".twx", ".bit")]
+        #The guide report is only valid if this build was guided (it may be left over from an earlier run)
+        if self._guided:
+            files.append(baseName + ".grf")
+        return files
+
+    @staticmethod
+    def _StoreGuideFile(manifest : ArtifactManifest, baseName : str, guideFile : str):
+        routedNcd = manifest.Find(re.escape(baseName + ".ncd"))
+        if len(routedNcd) == 0:
+            return
+        os.makedirs(os.path.dirname(guideFile), exist_ok=True)
+        shutil.copy2(routedNcd[0].path, guideFile)
+
+    @staticmethod
+    def _ParseGuideReport(manifest : ArtifactManifest, baseName : str):
+        #The guide report (*.grf) is written by PAR for SmartGuide runs
+        reports = manifest.Find(re.escape(baseName + ".grf"))
+        if len(reports) != 1:
+            return None
+        with open(reports[0].path) as f:
+            content = f.read()
+        percent = {}
+        for m in re.finditer(r"(Components|Nets)[^\n]*?([0-9.]+)%", content):
+            if m.group(1) not in percent:
+                percent[m.group(1)] = float(m.group(2))
+        if len(percent) == 0:
+            return None
+        return percent
+
@@ -0,0 +1,159 @@
+##############################################################################
+#  Copyright (c) 2018 by Paul Scherrer Institute, Switzerland
+#  All rights reserved.
+#  Authors: Oliver Bruendler
+##############################################################################
+
+########################################################################################################################
+# Import Statements
+########################################################################################################################
+import os
+import re
+import gzip
+import time
+from typing import Dict, List, Tuple
+
+########################################################################################################################
+# Constants
+########################################################################################################################
+INDEX_FILE = "index.txt"
+LOG_EXTENSION = ".log.gz"
+
+########################################################################################################################
+# Class Defintion
+########################################################################################################################
+class LogArchive:
+    """
+    This class implements a compressed archive for build logs. Logs are written gzip compressed. While writing, an index
+    of all message identities (<severity>:<tool>:<number>, e.g. WARNING:Xst:2042) and the lines they occur in is
+    appended to the index file of the archive. Queries only decompress logs that contain the identity searched for.
+
+    The archive can be passed to the build wrappers (e.g. Ise.BuildProject()) as log sink.
+    """
+
+    ####################################################################################################################
+    # Public Methods
+    ####################################################################################################################
+    def __init__(self, archiveDir : str):
+        """
+        Constructor
+
+        :param archiveDir: Directory of the archive (created if it does not exist)
+        """
+        self._archiveDir = os.path.abspath(archiveDir)
+        os.makedirs(self._archiveDir, exist_ok=True)
+
+    def Write(self, name : str, content : str) -> str:
+        """
+        Write a log into the archive
+
+        :param name: Name of the log (e.g. "build.log"). A timestamp is prepended to make the name unique.
+        :param content: Content of the log
+        :return: Name of the log in the archive (used to identify the log in query results)
+        """
+        logName = self._UniqueLogName(name)
+        identities = {}
+        #Lines are only split at "\n" and newline translation is disabled (newline=""), so line numbers in the index
+        #match the lines read back by _ReadLines() on all platforms
+        with gzip.open(self._LogPath(logName), "wt", encoding="utf-8", newline="") as f:
+            contentLines = content.split("\n")
+            for line, l in enumerate(contentLines):
+                f.write(l if line == len(contentLines) - 1 else l + "\n")
+                m = re.match(r"([A-Z]+):([A-Za-z]+):([0-9]+) - ", l)
+                if m is not None:
+                    identity = "{}:{}:{}".format(m.group(1), m.group(2), m.group(3))
+                    if identity not in identities:
+                        identities[identity] = []
+                    identities[identity].append(line)
+        #Index is only appended after the log is complete, so queries never see partially written logs
+        indexLines = ["{}\t{}\t{}\n".format(identity, logName, ",".join(str(l) for l in lines))
+                      for identity, lines in identities.items()]
+        with open(self._IndexPath(), "a") as f:
+            f.write("".join(indexLines))
+        return logName
+
+    def Query(self, identity : str, logFilter : str = None) -> List[Tuple[str, int, str]]:
+        """
+        Find all lines containing a given message identity in the archive
+
+        :param identity: Message identity in the form "<severity>:<tool>:<number>" (e.g. "WARNING:Xst:2042")
+        :param logFilter: Regex the log name must match (optional, e.g. ".*build.log" or "2018-06.*")
+        :return: List of tuples (logName, line, text). Lines are counted from 0 (same as ReportParsing).
+        """
+        results = []
+        for logName, lines in self.FindLogs(identity, logFilter).items():
+            results += self._ReadLines(logName, lines)
+        return results
+
+    def FindLogs(self, identity : str, logFilter : str = None) -> Dict[str, List[int]]:
+        """
+        Find all logs containing a given message identity (only the index is read, no log is decompressed)
+
+        :param identity: Message identity in the form "<severity>:<tool>:<number>" (e.g. "WARNING:Xst:2042")
+        :param logFilter: Regex the log name must match (optional)
+        :return: Dictionary containing the log names as keys and the list of lines containing the identity as values.
+        """
+        logs = {}
+        if not os.path.isfile(self._IndexPath()):
+            return logs
+        prefix = identity + "\t"
+        with open(self._IndexPath()) as f:
+            for l in f:
+                if not l.startswith(prefix):
+                    continue
+                _, logName, lines = l.rstrip("\n").split("\t")
+                if logFilter is not None and re.match(logFilter, logName) is None:
+                    continue
+                logs[logName] = [int(nr) for nr in lines.split(",")]
+        return logs
+
+    def ReadLog(self, logName : str) -> str:
+        """
+        Read a complete log from the archive
+
+        :param logName: Name of the log in the archive (as returned by Write())
+        :return: Content of the log
+        """
+        with gzip.open(self._LogPath(logName), "rt", encoding="utf-8", newline="") as f:
+            return f.read()
+
+    ####################################################################################################################
+    # Public Properties
+    ####################################################################################################################
+    @property
+    def ArchiveDir(self):
+        """
+        Get the directory of the archive
+        """
+        return self._archiveDir
+
+    ####################################################################################################################
+    # Private Methods
+    ####################################################################################################################
+    def _IndexPath(self) -> str:
+        return os.path.join(self._archiveDir, INDEX_FILE)
+
+    def _LogPath(self, logName : str) -> str:
+        return os.path.join(self._archiveDir, logName + LOG_EXTENSION)
+
+    def _UniqueLogName(self, name : str) -> str:
+        base = "{}_{}".format(time.strftime("%Y-%m-%d_%H-%M-%S"), os.path.basename(name))
+        logName = base
+        nr = 1
+        while os.path.exists(self._LogPath(logName)):
+            logName = "{}_{}".format(base, nr)
+            nr += 1
+        return logName
+
+    def _ReadLines(self, logName : str, lines : List[int]) -> List[Tuple[str, int, str]]:
+        results = []
+        wanted = set(lines)
+        lastLine = max(lines)
+        with gzip.open(self._LogPath(logName), "rt", encoding="utf-8", newline="\n") as f:
+            for nr, l in enumerate(f):
+                if nr in wanted:
+                    results.append((logName, nr, l.rstrip("\r\n")))
+                #Stop decompressing after the last line of interest
+                if nr >= lastLine:
+                    break
+        return results
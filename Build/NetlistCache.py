@@ -0,0 +1,193 @@
+##############################################################################
+#  Copyright (c) 2018 by Paul Scherrer Institute, Switzerland
+#  All rights reserved.
+#  Authors: Oliver Bruendler
+##############################################################################
+
+########################################################################################################################
+# Import Statements
+########################################################################################################################
+import os
+import shutil
+import hashlib
+import tempfile
+from typing import Dict, List
+from . import ProjectFiles
+
+########################################################################################################################
+# Class Defintion
+########################################################################################################################
+class NetlistCache:
+    """
+    This class implements a cache for synthesized pcore netlists (<instance>_wrapper.ngc) that is shared between EDK
+    projects. It is used by Edk.CleanBuild() to pre-populate the implementation directory after netlistclean, so XPS
+    does not synthesize these pcores again.
+
+    Netlists are identified by instance name (the netlist contains the wrapper module <instance>_wrapper), core name,
+    hardware version, parameters, connected ports and bus interfaces, target device and toolchain version. Because
+    platgen derives additional generics from the bus topology, the inputs of these generics are part of the key as well:
+    the configuration of the bus instance and of the bus masters (C_SPLB_DWIDTH, C_SPLB_NUM_MASTERS, C_SPLB_MID_WIDTH,
+    C_SPLB_SMALLEST_MASTER, ...) and whether the bus is point-to-point (C_SPLB_P2P). Other slaves on the bus are not part
+    of the key, so adding or moving a peripheral does not invalidate the netlists of the other peripherals. Only for the
+    bus instance itself (e.g. the bus arbiter and address decoder), all instances attached to the bus are part of the
+    key. For local pcores (found in the project directory or the module search paths of the project), the content of
+    the pcore directory is hashed.
+    """
+
+    ####################################################################################################################
+    # Public Methods
+    ####################################################################################################################
+    def __init__(self, cacheDir : str):
+        """
+        Constructor
+
+        :param cacheDir: Directory of the cache (created if it does not exist)
+        """
+        self._cacheDir = os.path.abspath(cacheDir)
+        os.makedirs(self._cacheDir, exist_ok=True)
+        self._hits = []
+        self._misses = []
+
+    def Populate(self, xmpPath : str, toolVersion : str):
+        """
+        Copy all cached netlists matching the pcore instances of a project into its implementation directory. The
+        instances found and not found in the cache are available through the properties Hits and Misses afterwards.
+
+        :param xmpPath: Path of the .xmp file of the project
+        :param toolVersion: Toolversion in the form "14.7"
+        """
+        self._hits = []
+        self._misses = []
+        implDir = os.path.dirname(os.path.abspath(xmpPath)) + "/implementation"
+        os.makedirs(implDir, exist_ok=True)
+        for instance, key in self.GetKeys(xmpPath, toolVersion).items():
+            entryDir = os.path.join(self._cacheDir, key)
+            if not os.path.isdir(entryDir):
+                self._misses.append(instance)
+                continue
+            #copyfile() is used on purpose, netlists must be newer than the MHS file to be considered up to date
+            for name in os.listdir(entryDir):
+                src = os.path.join(entryDir, name)
+                dst = os.path.join(implDir, name)
+                if os.path.isdir(src):
+                    shutil.rmtree(dst, ignore_errors=True)
+                    shutil.copytree(src, dst, copy_function=shutil.copyfile)
+                else:
+                    shutil.copyfile(src, dst)
+            self._hits.append(instance)
+
+    def Store(self, xmpPath : str, toolVersion : str) -> int:
+        """
+        Store the netlists of all pcore instances of a successfully built project that are not yet in the cache
+
+        :param xmpPath: Path of the .xmp file of the project
+        :param toolVersion: Toolversion in the form "14.7"
+        :return: Number of netlists added to the cache
+        """
+        implDir = os.path.dirname(os.path.abspath(xmpPath)) + "/implementation"
+        added = 0
+        for instance, key in self.GetKeys(xmpPath, toolVersion).items():
+            entryDir = os.path.join(self._cacheDir, key)
+            netlist = os.path.join(implDir, "{}_wrapper.ngc".format(instance))
+            if os.path.isdir(entryDir) or not os.path.isfile(netlist):
+                continue
+            #Copy into a temporary directory first so other builds never see incomplete entries
+            tmpDir = tempfile.mkdtemp(dir=self._cacheDir, prefix=".tmp_")
+            shutil.copy2(netlist, tmpDir)
+            subNetlists = os.path.join(implDir, "{}_wrapper".format(instance))
+            if os.path.isdir(subNetlists):
+                shutil.copytree(subNetlists, os.path.join(tmpDir, os.path.basename(subNetlists)))
+            try:
+                os.rename(tmpDir, entryDir)
+                added += 1
+            except OSError:
+                #Entry was added by another build in the meantime
+                shutil.rmtree(tmpDir, ignore_errors=True)
+        return added
+
+    def GetKeys(self, xmpPath : str, toolVersion : str) -> Dict[str, str]:
+        """
+        Get the cache keys of all pcore instances of a project
+
+        :param xmpPath: Path of the .xmp file of the project
+        :param toolVersion: Toolversion in the form "14.7"
+        :return: Dictionary containing the instance names as keys and the cache keys as values
+        """
+        prjDir = os.path.dirname(os.path.abspath(xmpPath))
+        xmp = ProjectFiles.ParseXmp(xmpPath)
+        searchDirs = ProjectFiles.GetModuleSearchDirs(xmpPath, xmp)
+        device = "|".join(xmp.get(item, "") for item in ("Architecture", "Device", "Package", "SpeedGrade"))
+        cores = [c for c in ProjectFiles.ParseMhs(os.path.join(prjDir, xmp["MHS File"])) if "INSTANCE" in c["parameters"]]
+        keys = {}
+        for core in cores:
+            version = core["parameters"].get("HW_VER", "")
+            keyHash = hashlib.sha256()
+            keyHash.update("{}\n{}\n".format(toolVersion, device).encode("utf-8"))
+            keyHash.update(self._CoreConfig(core).encode("utf-8"))
+            #Topology of the buses the instance is connected to and, for bus instances, all instances attached
+            for busIf, bus in sorted(core["buses"].items()):
+                keyHash.update("BUS {} = {}\n".format(busIf, self._BusTopology(cores, bus)).encode("utf-8"))
+            keyHash.update("SELF = {}\n".format(self._BusConfig(cores, core["parameters"]["INSTANCE"])).encode("utf-8"))
+            pcoreDir = ProjectFiles.FindModuleDir(searchDirs, "pcores", core["name"], version)
+            if pcoreDir is not None:
+                keyHash.update(ProjectFiles.HashDir(pcoreDir).encode("utf-8"))
+            instance = core["parameters"]["INSTANCE"]
+            keys[instance] = "{}_{}_{}".format(core["name"], version, keyHash.hexdigest()[:32])
+        return keys
+
+    ####################################################################################################################
+    # Public Properties
+    ####################################################################################################################
+    @property
+    def Hits(self) -> List[str]:
+        """
+        Get the instances found in the cache by the last call to Populate()
+        """
+        return self._hits
+
+    @property
+    def Misses(self) -> List[str]:
+        """
+        Get the instances not found in the cache by the last call to Populate()
+        """
+        return self._misses
+
+    ####################################################################################################################
+    # Private Methods
+    ####################################################################################################################
+    @staticmethod
+    def _CoreConfig(core : dict) -> str:
+        #Only the port names matter for the wrapper, not the nets they are connected to
+        items = [core["name"]] + sorted(core["parameters"].items()) + sorted(core["ports"]) + \
+                sorted(core["buses"].items())
+        return "\n".join(str(item) for item in items) + "\n"
+
+    @classmethod
+    def _BusConfig(cls, cores : List[dict], bus : str) -> str:
+        #All instances attached to a bus instance (masters, slaves, their addresses, ...), empty if it is no bus
+        hashes = [cls._CoreHash(core) for core in cores if bus in core["buses"].values()]
+        return ",".join(sorted(hashes))
+
+    @classmethod
+    def _BusTopology(cls, cores : List[dict], bus : str) -> str:
+        #Inputs of the generics platgen derives from a bus: bus instance, masters and number of slaves (slave bus
+        #interfaces are named S*, e.g. SPLB, S_AXI, SLMB)
+        busHash = ""
+        masters = []
+        slaves = 0
+        for core in cores:
+            if core["parameters"]["INSTANCE"] == bus:
+                busHash = cls._CoreHash(core)
+            for busIf, coreBus in core["buses"].items():
+                if coreBus != bus:
+                    continue
+                if busIf.startswith("S"):
+                    slaves += 1
+                else:
+                    masters.append(cls._CoreHash(core))
+        p2p = len(masters) == 1 and slaves == 1
+        return "{}|{}|P2P={}".format(busHash, ",".join(sorted(masters)), p2p)
+
+    @classmethod
+    def _CoreHash(cls, core : dict) -> str:
+        return hashlib.sha256(cls._CoreConfig(core).encode("utf-8")).hexdigest()
@@ -0,0 +1,134 @@
+##############################################################################
+#  Copyright (c) 2018 by Paul Scherrer Institute, Switzerland
+#  All rights reserved.
+#  Authors: Oliver Bruendler
+##############################################################################
+
+########################################################################################################################
+# Import Statements
+########################################################################################################################
+import os
+import json
+from typing import Callable, Dict, List
+from . import ProjectFiles
+
+########################################################################################################################
+# Class Defintion
+########################################################################################################################
+class Pipeline:
+    """
+    This class allows running a sequence of build steps (e.g. EDK build, HW export, SDK build, bitstream merge) with
+    checkpoints. After each completed step, a manifest containing the hashes of the inputs and outputs of the step is
+    written. When the pipeline is run again, all steps with unchanged inputs and outputs are skipped and execution
+    continues from the first step that is not valid anymore.
+    """
+
+    ####################################################################################################################
+    # Public Methods
+    ####################################################################################################################
+    def __init__(self, manifestPath : str):
+        """
+        Constructor
+
+        :param manifestPath: Path of the checkpoint manifest (JSON file, loaded if it already exists)
+        """
+        self._manifestPath = os.path.abspath(manifestPath)
+        self._steps = []
+        self._executedSteps = []
+        self._skippedSteps = []
+        self._manifest = {}
+        if os.path.isfile(self._manifestPath):
+            with open(self._manifestPath) as f:
+                self._manifest = json.load(f)
+
+    def AddStep(self, name : str, function : Callable[[], None], inputs : List[str] = None, outputs : List[str] = None):
+        """
+        Add a step to the pipeline. Steps are executed in the order they are added.
+
+        :param name: Unique name of the step
+        :param function: Function executing the step (called without arguments, e.g. a lambda)
+        :param inputs: Files or directories the step depends on (optional)
+        :param outputs: Files or directories the step produces (optional)
+        """
+        if name in [s[0] for s in self._steps]:
+            raise Exception("Step {} already exists".format(name))
+        self._steps.append((name, function, inputs or [], outputs or []))
+
+    def Run(self, force : bool = False):
+        """
+        Run the pipeline. Steps are skipped as long as their inputs and outputs are unchanged compared to the
+        manifest. Once a step is executed, all following steps are executed as well.
+
+        :param force: Execute all steps, ignoring the manifest (optional, default is False)
+        """
+        self._executedSteps = []
+        self._skippedSteps = []
+        valid = not force
+        for name, function, inputs, outputs in self._steps:
+            if valid and self._IsStepValid(name, inputs, outputs):
+                self._skippedSteps.append(name)
+                continue
+            valid = False
+            #Invalidate checkpoint before executing, so an aborted step is never skipped
+            self._manifest.pop(name, None)
+            self._WriteManifest()
+            #Hash inputs before executing, inputs changed while the step runs must invalidate the checkpoint
+            inputHashes = self._HashPaths(inputs)
+            function()
+            outputHashes = self._HashPaths(outputs)
+            missing = [path for path, digest in outputHashes.items() if digest is None]
+            if len(missing) != 0:
+                raise Exception("Step {} did not produce the outputs: {}".format(name, ", ".join(missing)))
+            self._manifest[name] = {"inputs"  : inputHashes,
+                                    "outputs" : outputHashes}
+            self._WriteManifest()
+            self._executedSteps.append(name)
+
+    def Invalidate(self, name : str = None):
+        """
+        Remove the checkpoint of a step, so the pipeline continues from this step on the next run
+
+        :param name: Name of the step (optional, if not given all checkpoints are removed)
+        """
+        if name is None:
+            self._manifest = {}
+        else:
+            self._manifest.pop(name, None)
+        self._WriteManifest()
+
+    ####################################################################################################################
+    # Public Properties
+    ####################################################################################################################
+    @property
+    def ExecutedSteps(self):
+        """
+        Get the names of the steps executed by the last call to Run()
+        """
+        return self._executedSteps
+
+    @property
+    def SkippedSteps(self):
+        """
+        Get the names of the steps skipped by the last call to Run() because their checkpoint was valid
+        """
+        return self._skippedSteps
+
+    ####################################################################################################################
+    # Private Methods
+    ####################################################################################################################
+    def _IsStepValid(self, name : str, inputs : List[str], outputs : List[str]) -> bool:
+        if name not in self._manifest:
+            return False
+        checkpoint = self._manifest[name]
+        return checkpoint["inputs"] == self._HashPaths(inputs) and checkpoint["outputs"] == self._HashPaths(outputs)
+
+    def _WriteManifest(self):
+        #Write to temporary file and replace, so the manifest is never left half-written
+        tmpPath = self._manifestPath + ".tmp"
+        with open(tmpPath, "w+") as f:
+            json.dump(self._manifest, f, indent=4, sort_keys=True)
+        os.replace(tmpPath, self._manifestPath)
+
+    @staticmethod
+    def _HashPaths(paths : List[str]) -> Dict[str, str]:
+        return {path : ProjectFiles.HashPath(path) for path in paths}
@@ -0,0 +1,206 @@
+##############################################################################
+#  Copyright (c) 2018 by Paul Scherrer Institute, Switzerland
+#  All rights reserved.
+#  Authors: Oliver Bruendler
+##############################################################################
+
+########################################################################################################################
+# Import Statements
+########################################################################################################################
+import os
+import re
+import hashlib
+import xml.etree.ElementTree as ElementTree
+from typing import Dict, List, Tuple
+
+########################################################################################################################
+# Constants
+########################################################################################################################
+XISE_NAMESPACE = "{http://www.xilinx.com/XMLSchema}"
+
+########################################################################################################################
+# Hashing
+########################################################################################################################
+def HashFile(path : str) -> str:
+    """
+    Calculate the SHA-256 hash of a file (read in chunks, so large netlists/bitstreams are not loaded into memory)
+
+    :param path: Path of the file
+    :return: Hash as hex string
+    """
+    fileHash = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024*1024), b""):
+            fileHash.update(chunk)
+    return fileHash.hexdigest()
+
+def HashDir(path : str) -> str:
+    """
+    Calculate a SHA-256 hash over the relative paths and contents of all files in a directory (recursive)
+
+    :param path: Path of the directory
+    :return: Hash as hex string
+    """
+    dirHash = hashlib.sha256()
+    for filePath in ListFiles(path):
+        dirHash.update(os.path.relpath(filePath, path).replace("\\", "/").encode("utf-8"))
+        dirHash.update(HashFile(filePath).encode("utf-8"))
+    return dirHash.hexdigest()
+
+def HashPath(path : str) -> str:
+    """
+    Hash a file or a directory
+
+    :param path: Path of the file or directory
+    :return: Hash as hex string, None if the path does not exist
+    """
+    if os.path.isfile(path):
+        return HashFile(path)
+    if os.path.isdir(path):
+        return HashDir(path)
+    return None
+
+def ListFiles(path : str) -> List[str]:
+    """
+    List all files in a directory (recursive, sorted)
+
+    :param path: Path of the directory
+    :return: List of file paths
+    """
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs.sort()
+        files += [os.path.join(root, f) for f in sorted(names)]
+    return files
+
+########################################################################################################################
+# ISE Project Files
+########################################################################################################################
+def ParseXiseProperties(xisePath : str) -> Dict[str, str]:
+    """
+    Get the properties of an ISE project (.xise)
+
+    :param xisePath: Path of the .xise file
+    :return: Dictionary containing the property names as keys and their values as values
+    """
+    root = ElementTree.parse(xisePath).getroot()
+    properties = {}
+    for element in root.iter(XISE_NAMESPACE + "property"):
+        name = element.get(XISE_NAMESPACE + "name")
+        if name is not None:
+            properties[name] = element.get(XISE_NAMESPACE + "value", "")
+    return properties
+
+def GetXiseTopName(xisePath : str, properties : Dict[str, str] = None) -> str:
+    """
+    Get the name of the top level module of an ISE project (the implementation output files are named after it)
+
+    :param xisePath: Path of the .xise file
+    :param properties: Properties as returned by ParseXiseProperties() (optional, parsed if not given)
+    :return: Name of the top level module
+    """
+    if properties is None:
+        properties = ParseXiseProperties(xisePath)
+    #Value is in the form "Architecture|<top>|<architecture>" or "Module|<top>"
+    top = properties.get("Implementation Top", "").split("|")
+    if len(top) < 2 or top[1] == "":
+        raise Exception("Top level module of {} is not set".format(xisePath))
+    return top[1]
+
+########################################################################################################################
+# EDK Project Files
+########################################################################################################################
+def ParseXmp(xmpPath : str) -> Dict[str, str]:
+    """
+    Parse an EDK project file (.xmp)
+
+    :param xmpPath: Path of the .xmp file
+    :return: Dictionary containing all entries of the file (e.g. {"MHS File" : "system.mhs", "Device" : "xc6slx45"})
+    """
+    items = {}
+    with open(xmpPath) as f:
+        for l in f:
+            m = re.match(r"\s*([^:#]+):\s*(.*?)\s*$", l)
+            if m is not None:
+                items[m.group(1).strip()] = m.group(2)
+    return items
+
+def GetModuleSearchDirs(xmpPath : str, xmp : Dict[str, str] = None) -> List[str]:
+    """
+    Get the directories pcores and drivers are searched in (project directory and ModuleSearchPath entries)
+
+    :param xmpPath: Path of the .xmp file
+    :param xmp: Content of the .xmp file as returned by ParseXmp() (optional, parsed if not given)
+    :return: List of directories
+    """
+    if xmp is None:
+        xmp = ParseXmp(xmpPath)
+    prjDir = os.path.dirname(os.path.abspath(xmpPath))
+    return [prjDir] + [os.path.join(prjDir, p) for p in xmp.get("ModuleSearchPath", "").split(";") if p != ""]
+
+def FindModuleDir(searchDirs : List[str], kind : str, name : str, version : str) -> str:
+    """
+    Find a local (non Xilinx) pcore or driver in the module search directories
+
+    :param searchDirs: Directories to search in (see GetModuleSearchDirs())
+    :param kind: "pcores" or "drivers"
+    :param name: Name of the pcore or driver
+    :param version: Version in the form "1.00.a"
+    :return: Path of the pcore/driver directory, None if it is not found (e.g. Xilinx IP)
+    """
+    moduleDirName = "{}_v{}".format(name, version.replace(".", "_"))
+    for searchDir in searchDirs:
+        moduleDir = os.path.join(searchDir, kind, moduleDirName)
+        if os.path.isdir(moduleDir):
+            return moduleDir
+    return None
+
+def ParseMhs(mhsPath : str) -> List[dict]:
+    """
+    Parse the core instances of an MHS file
+
+    :param mhsPath: Path of the .mhs file
+    :return: List containing one dictionary per BEGIN/END block with the entries "name" (core name, lower case),
+             "parameters", "ports" and "buses" (dictionaries with the upper case names as keys and the values/nets
+             they are connected to as values)
+    """
+    return _ParseBlocks(mhsPath)
+
+def ParseMss(mssPath : str) -> List[Tuple[str, str]]:
+    """
+    Get the drivers and the OS used in an MSS file
+
+    :param mssPath: Path of the .mss file
+    :return: List of tuples (name, version)
+    """
+    modules = []
+    for block in _ParseBlocks(mssPath):
+        for nameParam, versionParam in (("DRIVER_NAME", "DRIVER_VER"), ("OS_NAME", "OS_VER")):
+            if nameParam in block["parameters"] and versionParam in block["parameters"]:
+                modules.append((block["parameters"][nameParam].lower(), block["parameters"][versionParam]))
+    return modules
+
+def _ParseBlocks(path : str) -> List[dict]:
+    blocks = []
+    block = None
+    with open(path) as f:
+        for l in f:
+            l = l.split("#")[0].strip()
+            m = re.match(r"(\w+)\s*(.*)", l)
+            if m is None:
+                continue
+            keyword = m.group(1).upper()
+            if keyword == "BEGIN":
+                block = {"name" : m.group(2).strip().lower(), "parameters" : {}, "ports" : {}, "buses" : {}}
+            elif keyword == "END" and block is not None:
+                blocks.append(block)
+                block = None
+            elif block is not None and "=" in m.group(2):
+                name, value = [s.strip() for s in m.group(2).split("=", 1)]
+                if keyword == "PARAMETER":
+                    block["parameters"][name.upper()] = value
+                elif keyword == "PORT":
+                    block["ports"][name.upper()] = value
+                elif keyword == "BUS_INTERFACE":
+                    block["buses"][name.upper()] = value
+    return blocks
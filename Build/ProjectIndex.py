@@ -0,0 +1,240 @@
+##############################################################################
+#  Copyright (c) 2018 by Paul Scherrer Institute, Switzerland
+#  All rights reserved.
+#  Authors: Oliver Bruendler
+##############################################################################
+
+########################################################################################################################
+# Import Statements
+########################################################################################################################
+import os
+import json
+import xml.etree.ElementTree as ElementTree
+from typing import List
+from . import ProjectFiles
+
+########################################################################################################################
+# Constants
+########################################################################################################################
+#Changes of these files can add or remove sources of the projects using them
+DESCRIPTION_EXTENSIONS = (".xise", ".xmp", ".mhs", ".mss")
+
+########################################################################################################################
+# Class Defintion
+########################################################################################################################
+class ProjectIndex:
+    """
+    This class keeps a persistent index of the source files used by ISE (.xise) and EDK (.xmp) projects. It allows
+    finding the projects affected by a set of changed files, so only these projects have to be built (e.g. in CI).
+
+    For EDK projects, the MHS, MSS and UCF files as well as all files of local pcores and drivers (in the project
+    directory or the module search paths) are considered as sources.
+    """
+
+    ####################################################################################################################
+    # Public Methods
+    ####################################################################################################################
+    def __init__(self, indexPath : str):
+        """
+        Constructor
+
+        :param indexPath: Path of the index file (JSON file, loaded if it already exists)
+        """
+        self._indexPath = os.path.abspath(indexPath)
+        self._projects = {}
+        self._files = {}
+        self._moduleDirs = {}
+        if os.path.isfile(self._indexPath):
+            with open(self._indexPath) as f:
+                index = json.load(f)
+            self._projects = index["projects"]
+            self._files = {file : set(projects) for file, projects in index["files"].items()}
+            self._moduleDirs = index.get("moduleDirs", {})
+
+    def AddProject(self, projectPath : str):
+        """
+        Parse a project and add it to the index (an existing entry of the project is replaced). Call Save() to make
+        the changes persistent.
+
+        :param projectPath: Path of the .xise or .xmp file
+        """
+        project = self._NormPath(projectPath)
+        self.RemoveProject(project)
+        files = [self._NormPath(f) for f in self.GetSourceFiles(projectPath)]
+        self._projects[project] = sorted(set(files))
+        self._moduleDirs[project] = sorted(set(self._NormPath(d) for d in self.GetModuleDirs(projectPath)))
+        for file in self._projects[project]:
+            self._files.setdefault(file, set()).add(project)
+
+    def RemoveProject(self, projectPath : str):
+        """
+        Remove a project from the index. Call Save() to make the changes persistent.
+
+        :param projectPath: Path of the .xise or .xmp file
+        """
+        project = self._NormPath(projectPath)
+        self._moduleDirs.pop(project, None)
+        for file in self._projects.pop(project, []):
+            self._files[file].discard(project)
+            if len(self._files[file]) == 0:
+                del self._files[file]
+
+    def Save(self):
+        """
+        Write the index to the index file
+        """
+        #Write to temporary file and replace, so the index is never left half-written
+        tmpPath = self._indexPath + ".tmp"
+        with open(tmpPath, "w+") as f:
+            json.dump({"projects"   : self._projects,
+                       "moduleDirs" : self._moduleDirs,
+                       "files"      : {file : sorted(projects) for file, projects in self._files.items()}},
+                      f, indent=4, sort_keys=True)
+        os.replace(tmpPath, self._indexPath)
+
+    def GetAffectedProjects(self, changedFiles : List[str]) -> List[str]:
+        """
+        Get all projects using at least one of the files given. If a project or description file (.xise, .xmp, .mhs,
+        .mss) or a file in a local pcore/driver directory of a project changed, the project is parsed again first, so
+        added sources are detected. Call Save() to make the updated index persistent.
+
+        :param changedFiles: Paths of the changed files
+        :return: Sorted list of the affected projects (absolute paths of the .xise/.xmp files)
+        """
+        changed = [self._NormPath(file) for file in changedFiles]
+        affected = set()
+        for file in changed:
+            affected |= self._files.get(file, set())
+        #Update projects whose source list may have changed
+        reparse = set()
+        for file in changed:
+            if file in self._projects or file.endswith(DESCRIPTION_EXTENSIONS):
+                reparse |= self._files.get(file, set())
+            #Files added to a local pcore/driver are not in the index yet
+            for project, moduleDirs in self._moduleDirs.items():
+                if any(file.startswith(moduleDir + "/") for moduleDir in moduleDirs):
+                    reparse.add(project)
+        if len(reparse) > 0:
+            for project in reparse:
+                if os.path.isfile(project):
+                    self.AddProject(project)
+                else:
+                    self.RemoveProject(project)
+            for file in changed:
+                affected |= self._files.get(file, set())
+        return sorted(affected)
+
+    @classmethod
+    def GetSourceFiles(cls, projectPath : str) -> List[str]:
+        """
+        Get the source files of a project (including the project file itself)
+
+        :param projectPath: Path of the .xise or .xmp file
+        :return: List of source file paths
+        """
+        if projectPath.lower().endswith(".xise"):
+            return [projectPath] + cls.ParseXise(projectPath)
+        if projectPath.lower().endswith(".xmp"):
+            return [projectPath] + cls.ParseXmp(projectPath)
+        raise Exception("Project type of {} is not supported".format(projectPath))
+
+    @classmethod
+    def GetModuleDirs(cls, projectPath : str) -> List[str]:
+        """
+        Get the local pcore and driver directories used by a project (for ISE projects, the ones of the EDK projects
+        they contain)
+
+        :param projectPath: Path of the .xise or .xmp file
+        :return: List of directory paths
+        """
+        if projectPath.lower().endswith(".xise"):
+            return [moduleDir for path in cls._XiseFiles(projectPath) if path.lower().endswith(".xmp")
+                    and os.path.isfile(path) for moduleDir in cls._XmpModuleDirs(path)]
+        if projectPath.lower().endswith(".xmp"):
+            return cls._XmpModuleDirs(projectPath)
+        raise Exception("Project type of {} is not supported".format(projectPath))
+
+    @classmethod
+    def ParseXise(cls, xisePath : str) -> List[str]:
+        """
+        Get the files of an ISE project. For EDK projects (.xmp) and cores (.xco) used in the project, their sources
+        are included.
+
+        :param xisePath: Path of the .xise file
+        :return: List of file paths
+        """
+        files = []
+        for path in cls._XiseFiles(xisePath):
+            files.append(path)
+            if path.lower().endswith(".xmp") and os.path.isfile(path):
+                files += cls.ParseXmp(path)
+            elif path.lower().endswith(".xco"):
+                #CORE Generator project settings (device, flow) are stored next to the .xco file
+                cgpPath = os.path.join(os.path.dirname(path), "coregen.cgp")
+                if os.path.isfile(cgpPath):
+                    files.append(cgpPath)
+        return files
+
+    @classmethod
+    def ParseXmp(cls, xmpPath : str) -> List[str]:
+        """
+        Get the files of an EDK project (MHS, MSS, UCF and all files of local pcores and drivers)
+
+        :param xmpPath: Path of the .xmp file
+        :return: List of file paths
+        """
+        prjDir = os.path.dirname(os.path.abspath(xmpPath))
+        xmp = ProjectFiles.ParseXmp(xmpPath)
+        files = [os.path.join(prjDir, xmp[key]) for key in ("MHS File", "MSS File") if xmp.get(key, "") != ""]
+        #XPS 14.x writes "UcfFile", older versions "UCF File"
+        files += [os.path.join(prjDir, xmp[key]) for key in ("UcfFile", "UCF File") if xmp.get(key, "") != ""]
+        for moduleDir in cls._XmpModuleDirs(xmpPath, xmp):
+            files += ProjectFiles.ListFiles(moduleDir)
+        return files
+
+    ####################################################################################################################
+    # Public Properties
+    ####################################################################################################################
+    @property
+    def Projects(self) -> List[str]:
+        """
+        Get all projects in the index
+        """
+        return sorted(self._projects.keys())
+
+    ####################################################################################################################
+    # Private Methods
+    ####################################################################################################################
+    @staticmethod
+    def _XiseFiles(xisePath : str) -> List[str]:
+        prjDir = os.path.dirname(os.path.abspath(xisePath))
+        root = ElementTree.parse(xisePath).getroot()
+        return [os.path.join(prjDir, element.get(ProjectFiles.XISE_NAMESPACE + "name"))
+                for element in root.iter(ProjectFiles.XISE_NAMESPACE + "file")
+                if element.get(ProjectFiles.XISE_NAMESPACE + "name") is not None]
+
+    @staticmethod
+    def _XmpModuleDirs(xmpPath : str, xmp : dict = None) -> List[str]:
+        prjDir = os.path.dirname(os.path.abspath(xmpPath))
+        if xmp is None:
+            xmp = ProjectFiles.ParseXmp(xmpPath)
+        searchDirs = ProjectFiles.GetModuleSearchDirs(xmpPath, xmp)
+        modules = []
+        if xmp.get("MHS File", "") != "":
+            modules += [("pcores", core["name"], core["parameters"]["HW_VER"])
+                        for core in ProjectFiles.ParseMhs(os.path.join(prjDir, xmp["MHS File"]))
+                        if "HW_VER" in core["parameters"]]
+        if xmp.get("MSS File", "") != "":
+            modules += [("drivers", name, version)
+                        for name, version in ProjectFiles.ParseMss(os.path.join(prjDir, xmp["MSS File"]))]
+        #Only local modules (project directory or module search paths) are considered, Xilinx IP is not
+        moduleDirs = []
+        for kind, name, version in modules:
+            moduleDir = ProjectFiles.FindModuleDir(searchDirs, kind, name, version)
+            if moduleDir is not None and moduleDir not in moduleDirs:
+                moduleDirs.append(moduleDir)
+        return moduleDirs
+
+    @staticmethod
+    def _NormPath(path : str) -> str:
+        return os.path.normcase(os.path.normpath(os.path.abspath(path))).replace("\\", "/")
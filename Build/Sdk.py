@@ -16,10 +16,15 @@ from PsiPyUtils.FileOperations import *
 import shutil
 from typing import List
 import re
+import json
+from .ArtifactManifest import ArtifactManifest
+from . import ProjectFiles
 
 ########################################################################################################################
 # Constants
 ########################################################################################################################
+BUILD_STAMP_FILE = ".isescripting_build.json"
+
 EXPECTED_ERRORS = [
     # KW82: The LibGen for PowerPC prints to stderr an info message of content like:
     # "powerpc-eabi-ar: creating ../../../lib/libxil.a"
@@ -65,6 +70,7 @@ class Sdk:
         self._fullStdout = ""
         self._lastStdout = ""
         self._lastStderr = ""
+        self._lastBuildClean = None
         if sys.platform.startswith("win"):
             AddToPathVariable("XILINX",     "{}/ISE_DS/ISE".format(self._isePath))
             # Is not necessary. It only confuses the next call of xps in the Edk class
@@ -88,7 +94,8 @@ class Sdk:
         else:
             raise Exception("OS {} not supported".format(sys.platform))
 
-    def CreateNewWs(self, hwPrjPath : str, bspPrjPath : str, appPrjPath : str, workspacePath : str):
+    def CreateNewWs(self, hwPrjPath : str, bspPrjPath : str, appPrjPath : str, workspacePath : str,
+                    hwManifest : ArtifactManifest = None):
         """
         Create a new workspace and import projects
 
@@ -96,13 +103,11 @@ class Sdk:
         :param bspPrjPath:  BSP Project to import
         :param appPrjPath: Application Project to import
         :param workspacePath: Path of the workspace (if it exists, the existing workspace will be deleted!)
+        :param hwManifest: Manifest returned by Edk.ExportHw(). If given, the hardware specification is taken from the
+                           manifest instead of searching the HW project directory for *.xml files (optional)
         """
         #Store data
-        self._lastWs_path = AbsPathLinuxStyle(workspacePath)
-        self._lastWs_bspName = os.path.basename(bspPrjPath)
-        self._lastWs_appName = os.path.basename(appPrjPath)
-        self._lastWs_hwPath = AbsPathLinuxStyle(hwPrjPath)
-        self._lastWs_bspPath = AbsPathLinuxStyle(bspPrjPath)
+        self._SetWs(hwPrjPath, bspPrjPath, appPrjPath, workspacePath, hwManifest)
 
         #Delete workspace if it already exists
         shutil.rmtree(workspacePath, ignore_errors=True)        
@@ -119,28 +124,63 @@ class Sdk:
         call.run_sync(timeout_sec=60)
         self._UpdateStdOut(call)
 
-    def GenerateBspForCreatedWs(self, cpuInstName : str, timeoutSec = 120):
+    def AttachWs(self, hwPrjPath : str, bspPrjPath : str, appPrjPath : str, workspacePath : str,
+                 hwManifest : ArtifactManifest = None):
+        """
+        Use an existing workspace (created by CreateNewWs() before) without deleting and re-importing the projects.
+        This is intended for edit-build iterations: call AttachWs() and BuildCreatedWs(incremental=True) only.
+        GenerateBspForCreatedWs() can be skipped as long as the hardware specification and the .mss file are
+        unchanged, since regenerating the BSP forces a clean build of the application. If they changed,
+        BuildCreatedWs(incremental=True) raises an exception and GenerateBspForCreatedWs() must be called first.
+
+        :param hwPrjPath: HW Project of the workspace
+        :param bspPrjPath:  BSP Project of the workspace
+        :param appPrjPath: Application Project of the workspace
+        :param workspacePath: Path of the existing workspace
+        :param hwManifest: Manifest returned by Edk.ExportHw() (optional, see CreateNewWs())
+        """
+        if not os.path.isdir(workspacePath):
+            raise Exception("Workspace {} does not exist, use CreateNewWs() to create it".format(workspacePath))
+        self._SetWs(hwPrjPath, bspPrjPath, appPrjPath, workspacePath, hwManifest)
+
+    def GenerateBspForCreatedWs(self, cpuInstName : str, timeoutSec = 120) -> ArtifactManifest:
         """
-        Generate BSP for the last workspace created using CreateNewWs()
+        Generate BSP for the last workspace created using CreateNewWs() or attached using AttachWs(). The hardware
+        specification and .mss file used are recorded in the workspace to detect an outdated BSP in incremental builds.
 
         :param cpuInstName: Name of the microblaze instance (e.g. microblaze_inst, ppc440_inst)
         :param timeoutSec: Timeout for the BSP build process
+        :return: Manifest of the BSP libraries and headers produced (libxil.a and xparameters.h)
         """
         #Find system name
-        sysName = FindWithWildcard(self._lastWs_hwPath, ".*\.xml")[0].split(".")[0]
+        hwSpec = self._HwSpecPath()
+        sysName = os.path.basename(hwSpec).split(".")[0]
 
         #Generate bsp
         call = ExtAppCall(self._lastWs_bspPath, "libgen -hw {hwxml} -pe {proc} {mss}".format(
-                                hwxml=(self._lastWs_hwPath + "/" + sysName + ".xml"),
+                                hwxml=hwSpec,
                                 proc=cpuInstName,
                                 mss=sysName + ".mss"))
         call.run_sync(timeout_sec=timeoutSec)
         self._UpdateStdOut(call)
+        state = self._ReadBuildState()
+        state["bsp"] = self._BspInputStamp()
+        self._WriteBuildState(state)
+        cpuDir = "{}/{}".format(self._lastWs_bspPath, cpuInstName)
+        return ArtifactManifest.FromFiles([cpuDir + "/lib/libxil.a", cpuDir + "/include/xparameters.h"])
 
-    def BuildCreatedWs(self, timeoutSec = 300):
+    def BuildCreatedWs(self, timeoutSec = 300, incremental : bool = False, projects : List[str] = None,
+                       config : str = None) -> ArtifactManifest:
         """
-        Generate BSP for the last workspace created using CreateNewWs(). Note that the BSP must already exist before
-        BuildCreatedWs() is called.
+        Build the last workspace created using CreateNewWs() or attached using AttachWs(). Note that the BSP must
+        already exist before BuildCreatedWs() is called.
+
+        By default all projects are cleaned and built. In incremental mode only the selected projects are built and
+        only files changed since the last build are recompiled. A clean build of a selected project/configuration is
+        executed anyway if the toolchain or the generated BSP (libxil.a, xparameters.h) changed since its last
+        successful build (or if there is no record of a previous build). The state of the builds is stored per
+        project and configuration in <workspacePath>/.isescripting_build.json. An exception is raised if the hardware
+        specification (.xml file) or the .mss file changed since the BSP was generated by GenerateBspForCreatedWs().
 
         COMMON PROBLE: the elfcheck can fail because the default settings in SDK are not correct. To fix this issue,
         change the Hardware Specification path for elfcheckt relative to $(ProjDirPath) for all build configurations (not
@@ -149,15 +189,67 @@ class Sdk:
         AppProject > Properties > C/C++ Build > Settings > Tool Settings > Xilinx ELF Check > Options > Hardware Specification
 
         :param timeoutSec: Timeout for the build
+        :param incremental: Only rebuild changed files of the selected projects (optional, default is False)
+        :param projects: Names of the projects to build in incremental mode (optional, default is the application
+                         project passed to CreateNewWs())
+        :param config: Build configuration to build in incremental mode (optional, e.g. "Debug", default is all)
+        :return: Manifest of the *.elf files of the application project (<appPrjPath>/<config>/<appName>.elf)
         """
-        #Clean and Build Projects
-        cmd = self._SdkHeadlessCommand(["-cleanBuild all",
-                                        "-data {}".format(self._lastWs_path)])
+        stamp = self._BuildStamp()
+        state = self._ReadBuildState()
+        if not incremental:
+            #Clean and Build Projects
+            cmd = self._SdkHeadlessCommand(["-cleanBuild all",
+                                            "-data {}".format(self._lastWs_path)])
+            call = ExtAppCall(".", cmd)
+            call.run_sync(timeout_sec=timeoutSec)
+            self._lastBuildClean = True
+            self._UpdateStdOut(call)
+            #All projects and configurations are up to date
+            state["builds"] = {"*" : stamp}
+            self._WriteBuildState(state)
+            return ArtifactManifest.FromFiles(self._ElfFiles())
+
+        #Select projects and configuration
+        if projects is None:
+            projects = [self._lastWs_appName]
+        selection = ["{}/{}".format(prj, "*" if config is None else config) for prj in projects]
+
+        #Building against an outdated BSP would silently produce an application not matching the hardware
+        if state.get("bsp") != self._BspInputStamp():
+            raise Exception("Hardware specification or .mss file changed since the BSP was generated (or no BSP was "
+                            "generated for this workspace), call GenerateBspForCreatedWs() first")
+
+        #Only clean the selections whose toolchain or BSP changed since their last successful build
+        stamps = state.get("builds", {})
+        options = []
+        cleaned = False
+        for sel in selection:
+            if self._LastBuildStamp(stamps, sel) != stamp:
+                options.append("-cleanBuild {}".format(sel.replace("/*", "")))
+                cleaned = True
+            else:
+                options.append("-build {}".format(sel.replace("/*", "")))
+        self._lastBuildClean = cleaned
+
+        #Build Projects
+        cmd = self._SdkHeadlessCommand(options + ["-data {}".format(self._lastWs_path)])
         call = ExtAppCall(".", cmd)
         call.run_sync(timeout_sec=timeoutSec)
         self._UpdateStdOut(call)
 
-    def CreateBitstreamWithSw(self, bmmPath : str, bitPath : str, elfPath : str, outputPath : str):
+        #Remember state of the successful build, a project-wide entry replaces the entries of single configurations
+        for sel in selection:
+            if sel.endswith("/*"):
+                prefix = sel[:-1]
+                stamps = {key : value for key, value in stamps.items() if not key.startswith(prefix)}
+            stamps[sel] = stamp
+        state["builds"] = stamps
+        self._WriteBuildState(state)
+        return ArtifactManifest.FromFiles(self._ElfFiles(config))
+
+    def CreateBitstreamWithSw(self, bmmPath : str, bitPath : str, elfPath : str,
+                              outputPath : str) -> ArtifactManifest:
         """
         Merge logic bitstream and ELF into one bitstream
 
@@ -165,10 +257,14 @@ class Sdk:
         :param bitPath: Path to the .bit file (usually in HW)
         :param elfPath: Path to the .elf file (usually in APP/<config>)
         :param outputPath: Output file path
+        :return: Manifest containing the output file
         """
         call = ExtAppCall(".","data2mem -bm {} -bt {} -bd {} -o b {}".format(bmmPath, bitPath, elfPath, outputPath))
         call.run_sync(timeout_sec=60)
         self._UpdateStdOut(call)
+        manifest = ArtifactManifest()
+        manifest.Add(outputPath)
+        return manifest
 
     def ClearFullStdout(self):
         """
@@ -204,16 +300,92 @@ class Sdk:
         """
         return self._lastStderr
 
+    @property
+    def LastBuildWasClean(self):
+        """
+        Get whether the last call to BuildCreatedWs() executed a clean build. Returns None if no build was executed.
+        """
+        return self._lastBuildClean
+
 
     ####################################################################################################################
     # Private Methods
     ####################################################################################################################
+    def _SetWs(self, hwPrjPath : str, bspPrjPath : str, appPrjPath : str, workspacePath : str,
+               hwManifest : ArtifactManifest):
+        self._lastWs_path = AbsPathLinuxStyle(workspacePath)
+        self._lastWs_bspName = os.path.basename(bspPrjPath)
+        self._lastWs_appName = os.path.basename(appPrjPath)
+        self._lastWs_hwPath = AbsPathLinuxStyle(hwPrjPath)
+        self._lastWs_bspPath = AbsPathLinuxStyle(bspPrjPath)
+        self._lastWs_appPath = AbsPathLinuxStyle(appPrjPath)
+        self._lastWs_hwManifest = hwManifest
+
     def _SdkHeadlessCommand(self, options : List[str]):
         cmdBase = "{eclipse} -vm {vm} -nosplash -application org.eclipse.cdt.managedbuilder.core.headlessbuild".format(eclipse=self._eclipseCmd, vm=self._jrePath)
         options = " ".join(options)
         cmdEnd = "-vmargs -Dorg.eclipse.cdt.core.console=org.eclipse.cdt.core.systemConsole"
         return " ".join([cmdBase, options, cmdEnd])
 
+    def _BuildStamp(self) -> dict:
+        #Hashes of everything that requires a clean build of the application when changed (the generated BSP, not its
+        #sources, so the application is only rebuilt against the BSP it is actually linked with)
+        stamp = {"toolchain" : "{} {}".format(self._version, self._isePath)}
+        for cpuInstName in sorted(os.listdir(self._lastWs_bspPath)):
+            for file in ("lib/libxil.a", "include/xparameters.h"):
+                path = "{}/{}/{}".format(self._lastWs_bspPath, cpuInstName, file)
+                if os.path.isfile(path):
+                    stamp["bsp/{}/{}".format(cpuInstName, file)] = ProjectFiles.HashFile(path)
+        return stamp
+
+    def _BspInputStamp(self) -> dict:
+        #Hashes of the files the BSP is generated from
+        stamp = {}
+        if self._lastWs_hwManifest is not None:
+            stamp["hw"] = self._lastWs_hwManifest.Get(".*\.xml").sha256
+        else:
+            stamp["hw"] = ProjectFiles.HashFile(self._HwSpecPath())
+        for name in FindWithWildcard(self._lastWs_bspPath, ".*\.mss"):
+            stamp["bsp/" + name] = ProjectFiles.HashFile(self._lastWs_bspPath + "/" + name)
+        return stamp
+
+    def _BuildStampPath(self) -> str:
+        #Stored in the workspace (not in the source projects), the build state belongs to the workspace
+        return self._lastWs_path + "/" + BUILD_STAMP_FILE
+
+    def _ReadBuildState(self) -> dict:
+        #{"bsp" : <BSP input stamp>, "builds" : {<selection> : <build stamp>}}
+        if not os.path.isfile(self._BuildStampPath()):
+            return {}
+        with open(self._BuildStampPath()) as f:
+            return json.load(f)
+
+    def _WriteBuildState(self, state : dict):
+        with open(self._BuildStampPath(), "w+") as f:
+            json.dump(state, f, indent=4, sort_keys=True)
+
+    @staticmethod
+    def _LastBuildStamp(stamps : dict, selection : str) -> dict:
+        #Entries are "<project>/<config>", "<project>/*" (all configurations) and "*" (all projects), most specific first
+        project = selection.split("/")[0]
+        for key in (selection, project + "/*", "*"):
+            if key in stamps:
+                return stamps[key]
+        return None
+
+    def _HwSpecPath(self) -> str:
+        if self._lastWs_hwManifest is not None:
+            return self._lastWs_hwManifest.Get(".*\.xml").path
+        return self._lastWs_hwPath + "/" + FindWithWildcard(self._lastWs_hwPath, ".*\.xml")[0]
+
+    def _ElfFiles(self, config : str = None) -> List[str]:
+        #Each build configuration has its own output directory in the application project
+        if config is not None:
+            configs = [config]
+        else:
+            configs = [d for d in os.listdir(self._lastWs_appPath) if os.path.isdir(self._lastWs_appPath + "/" + d)]
+        return ["{}/{}/{}.elf".format(self._lastWs_appPath, cfg, self._lastWs_appName) for cfg in sorted(configs)]
+
     @classmethod
     def _RemoveExpectedMessagesFromStderr(cls, stderr : str) -> str:
         for msg in EXPECTED_ERRORS:
@@ -3,8 +3,13 @@
 #  All rights reserved.
 #  Authors: Oliver Bruendler
 ##############################################################################
+from .ArtifactManifest import ArtifactManifest, Artifact
 from .Edk import Edk
 from .Impact import Impact
 from .Ise import Ise
+from .LogArchive import LogArchive
+from .NetlistCache import NetlistCache
+from .Pipeline import Pipeline
+from .ProjectIndex import ProjectIndex
 from .Sdk import Sdk
 from .Tools import Tools
\ No newline at end of file
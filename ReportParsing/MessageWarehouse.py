@@ -0,0 +1,212 @@
+##############################################################################
+#  Copyright (c) 2018 by Paul Scherrer Institute, Switzerland
+#  All rights reserved.
+#  Authors: Oliver Bruendler
+##############################################################################
+import os
+import sqlite3
+import time
+from typing import Dict, List, Tuple
+from .ReportParsing import ReportMsg, SynthesisReport
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    id          INTEGER PRIMARY KEY,
+    project     TEXT NOT NULL,
+    build       TEXT NOT NULL,
+    timestamp   REAL NOT NULL,
+    timingScore INTEGER,
+    UNIQUE (project, build)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    buildId     INTEGER NOT NULL REFERENCES builds(id) ON DELETE CASCADE,
+    identity    TEXT NOT NULL,
+    severity    TEXT NOT NULL,
+    tool        TEXT NOT NULL,
+    number      TEXT NOT NULL,
+    line        INTEGER NOT NULL,
+    message     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_identity ON messages (identity, buildId);
+CREATE INDEX IF NOT EXISTS idx_messages_build ON messages (buildId, identity, message);
+CREATE INDEX IF NOT EXISTS idx_builds_time ON builds (timestamp);
+"""
+
+class MessageWarehouse:
+    """
+    This class stores parsed report messages and timing scores of many builds in an indexed SQLite database to allow
+    queries across builds (e.g. when did a message first appear, which messages are new compared to another build).
+
+    Builds are identified by project name and build name (e.g. a version or a CI build number).
+    """
+
+    def __init__(self, dbPath : str):
+        """
+        Constructor (creates the database if it does not exist)
+
+        :param dbPath: Path of the SQLite database file
+        """
+        self._db = sqlite3.connect(dbPath)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(SCHEMA)
+
+    def Close(self):
+        """
+        Close the database
+        """
+        self._db.close()
+
+    def AddBuild(self, project : str, build : str, report : SynthesisReport = None, timingScore : int = None,
+                 timestamp : float = None) -> int:
+        """
+        Add the messages and the timing score of a build. If the build already exists, it is replaced.
+
+        :param project: Name of the project
+        :param build: Name of the build
+        :param report: Parsed report containing the messages of the build (optional)
+        :param timingScore: Timing score of the build (optional)
+        :param timestamp: Time of the build in seconds since the epoch (optional, default is the timestamp of the
+                          replaced build or the current time for new builds)
+        :return: Database ID of the build
+        """
+        with self._db:
+            if timestamp is None:
+                #Keep the time of a replaced build, so it does not move to the end of the history
+                row = self._db.execute("SELECT timestamp FROM builds WHERE project = ? AND build = ?",
+                                       (project, build)).fetchone()
+                timestamp = time.time() if row is None else row[0]
+            self._db.execute("DELETE FROM builds WHERE project = ? AND build = ?", (project, build))
+            cur = self._db.execute("INSERT INTO builds (project, build, timestamp, timingScore) VALUES (?, ?, ?, ?)",
+                                   (project, build, timestamp, timingScore))
+            buildId = cur.lastrowid
+            if report is not None:
+                self._db.executemany("INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                     (self._MsgRow(buildId, msg) for msg in report.messages))
+        return buildId
+
+    def AddReportFile(self, project : str, build : str, path : str, timingScore : int = None,
+                      timestamp : float = None) -> int:
+        """
+        Parse a synthesis report ("*.syr") and add its messages
+
+        :param project: Name of the project
+        :param build: Name of the build
+        :param path: Path of the report file
+        :param timingScore: Timing score of the build (optional)
+        :param timestamp: Time of the build in seconds since the epoch (optional, default is the modification time of
+                          the report file)
+        :return: Database ID of the build
+        """
+        if timestamp is None:
+            timestamp = os.path.getmtime(path)
+        return self.AddBuild(project, build, SynthesisReport(path), timingScore, timestamp)
+
+    def GetBuilds(self, project : str = None) -> List[Tuple[str, str, float, int]]:
+        """
+        Get all builds ordered by time
+
+        :param project: Only get builds of a given project (optional)
+        :return: List of tuples (project, build, timestamp, timingScore)
+        """
+        query = "SELECT project, build, timestamp, timingScore FROM builds"
+        args = ()
+        if project is not None:
+            query += " WHERE project = ?"
+            args = (project,)
+        return self._db.execute(query + " ORDER BY timestamp, id", args).fetchall()
+
+    def GetTimingScore(self, project : str, build : str) -> int:
+        """
+        Get the timing score of a build. Returns None if the score is not available.
+
+        :param project: Name of the project
+        :param build: Name of the build
+        """
+        row = self._db.execute("SELECT timingScore FROM builds WHERE project = ? AND build = ?",
+                               (project, build)).fetchone()
+        return None if row is None else row[0]
+
+    def GetMessages(self, identity : str = None, project : str = None, build : str = None) -> List[ReportMsg]:
+        """
+        Get messages. Additionally the messages can be filtered.
+
+        :param identity: Only get messages of a given identity ("<severity>:<tool>:<number>") (optional)
+        :param project: Only get messages of a given project (optional)
+        :param build: Only get messages of a given build (optional)
+        :return: List of messages (ReportMsg objects)
+        """
+        conditions = []
+        args = []
+        for column, value in (("m.identity", identity), ("b.project", project), ("b.build", build)):
+            if value is not None:
+                conditions.append("{} = ?".format(column))
+                args.append(value)
+        query = "SELECT m.tool, m.number, m.severity, m.message, m.line FROM messages m JOIN builds b ON b.id = m.buildId"
+        if len(conditions) != 0:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY b.timestamp, b.id, m.line"
+        return [ReportMsg(*row) for row in self._db.execute(query, args)]
+
+    def GetOccurrences(self, identity : str) -> List[Tuple[str, str, float, int]]:
+        """
+        Get all builds a message identity occurs in, ordered by time
+
+        :param identity: Message identity ("<severity>:<tool>:<number>")
+        :return: List of tuples (project, build, timestamp, count)
+        """
+        return self._db.execute("SELECT b.project, b.build, b.timestamp, COUNT(*) FROM messages m "
+                                "JOIN builds b ON b.id = m.buildId WHERE m.identity = ? "
+                                "GROUP BY b.id ORDER BY b.timestamp, b.id", (identity,)).fetchall()
+
+    def GetFirstOccurrences(self, identity : str) -> Dict[str, Tuple[str, float]]:
+        """
+        Get the first build a message identity occured in for each project
+
+        :param identity: Message identity ("<severity>:<tool>:<number>")
+        :return: A dictionary containing the project names as keys and tuples (build, timestamp) as values.
+        """
+        first = {}
+        for project, build, timestamp, _ in self.GetOccurrences(identity):
+            if project not in first:
+                first[project] = (build, timestamp)
+        return first
+
+    def DiffBuilds(self, oldProject : str, oldBuild : str, newProject : str,
+                   newBuild : str) -> Tuple[Dict[str,List[ReportMsg]], Dict[str,List[ReportMsg]]]:
+        """
+        Compare the messages of two builds. Messages are compared by identity and text (line numbers are ignored since
+        they usually change between builds).
+
+        :param oldProject: Project of the reference build (e.g. the last release)
+        :param oldBuild: Name of the reference build
+        :param newProject: Project of the build to compare
+        :param newBuild: Name of the build to compare
+        :return: Tuple (added, removed). Both are dictionaries in the same format as returned by
+                 SynthesisReport.GetMessagesAfterIdentites().
+        """
+        oldId = self._BuildId(oldProject, oldBuild)
+        newId = self._BuildId(newProject, newBuild)
+        return self._MessagesNotIn(newId, oldId), self._MessagesNotIn(oldId, newId)
+
+    @staticmethod
+    def _MsgRow(buildId : int, msg : ReportMsg) -> tuple:
+        identity = "{}:{}:{}".format(msg.severity, msg.tool, msg.number)
+        return (buildId, identity, msg.severity, msg.tool, str(msg.number), msg.line, msg.message)
+
+    def _BuildId(self, project : str, build : str) -> int:
+        row = self._db.execute("SELECT id FROM builds WHERE project = ? AND build = ?", (project, build)).fetchone()
+        if row is None:
+            raise Exception("Build {} of project {} does not exist".format(build, project))
+        return row[0]
+
+    def _MessagesNotIn(self, buildId : int, otherId : int) -> Dict[str,List[ReportMsg]]:
+        identities = {}
+        rows = self._db.execute("SELECT m.identity, m.tool, m.number, m.severity, m.message, m.line FROM messages m "
+                                "WHERE m.buildId = ? AND NOT EXISTS (SELECT 1 FROM messages o WHERE o.buildId = ? "
+                                "AND o.identity = m.identity AND o.message = m.message) ORDER BY m.line",
+                                (buildId, otherId))
+        for identity, *msg in rows:
+            if identity not in identities:
+                identities[identity] = []
+            identities[identity].append(ReportMsg(*msg))
+        return identities
@@ -6,6 +6,20 @@
 import re
 from typing import Dict, List
 
+#Variable parts of message texts: names in angle brackets (one nesting level for bus indices such as <data<3>>),
+#quoted strings, hex and decimal numbers
+_VARIABLE_TOKENS = re.compile(r"<(?:[^<>]|<[^<>]*>)*>|'[^']*'|\"[^\"]*\"|\b0x[0-9A-Fa-f]+\b|\b[0-9]+(?:\.[0-9]+)?\b")
+
+def MessageTemplate(message : str) -> str:
+    """
+    Reduce a message text to its template by replacing all variable parts (signal/instance names, quoted strings,
+    numbers) by "<*>". Example: "Signal <cnt<3>> is assigned but never used." -> "Signal <*> is assigned but never used."
+
+    :param message: Message text
+    :return: Template of the message
+    """
+    return _VARIABLE_TOKENS.sub("<*>", message)
+
 class ReportMsg:
     """
     This class allows accessing different properties of a message easily. Xilinx messages usually come in the format
@@ -29,6 +43,25 @@ class ReportMsg:
         self.line = line
 
 
+class MessageCluster:
+    """
+    This class represents a group of messages with the same identity and the same template (i.e. messages that only
+    differ in signal names, instance names or numbers).
+    """
+
+    def __init__(self, identity : str, template : str):
+        """
+        Constructor
+
+        :param identity: Message identity ("<severity>:<tool>:<number>")
+        :param template: Message template (see MessageTemplate())
+        """
+        self.identity = identity
+        self.template = template
+        self.count = 0
+        self.samples = []
+
+
 class SynthesisReport:
     """
     This class represents a synthesis report ("*.syr)
@@ -75,3 +108,29 @@ class SynthesisReport:
             identities[identity].append(msg)
         return identities
 
+    def GetMessageClusters(self, filterTool : str = None,
+                           filterSeverity : str = None,
+                           filterNumber : int = None,
+                           maxSamples : int = 5) -> List[MessageCluster]:
+        """
+        Get messages grouped after their identities and templates. Messages that only differ in variable parts (e.g.
+        signal or instance names) end up in the same cluster. Additionally the messages can be filtered.
+
+        :param filterTool: Only get messages from a given tool (optional)
+        :param filterSeverity: Only get messages of a given severity (optional)
+        :param filterNumber: Only get a specific message number (optional)
+        :param maxSamples: Maximum number of sample messages stored per cluster (optional, default is 5)
+        :return: List of clusters (MessageCluster objects), ordered by number of messages (descending)
+        """
+        clusters = {}
+        for identity, messages in self.GetMessagesAfterIdentites(filterTool, filterSeverity, filterNumber).items():
+            for msg in messages:
+                template = MessageTemplate(msg.message)
+                key = (identity, template)
+                cluster = clusters.get(key)
+                if cluster is None:
+                    cluster = clusters[key] = MessageCluster(identity, template)
+                cluster.count += 1
+                if len(cluster.samples) < maxSamples:
+                    cluster.samples.append(msg)
+        return sorted(clusters.values(), key=lambda c: c.count, reverse=True)
@@ -4,4 +4,5 @@
 #  Authors: Oliver Bruendler
 ##############################################################################
 
-from . import ReportParsing
\ No newline at end of file
+from . import ReportParsing
+from . import MessageWarehouse
\ No newline at end of file
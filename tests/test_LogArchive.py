@@ -0,0 +1,48 @@
+##############################################################################
+#  Copyright (c) 2018 by Paul Scherrer Institute, Switzerland
+#  All rights reserved.
+#  Authors: Oliver Bruendler
+##############################################################################
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+#LogArchive is pure python, import it directly to not depend on the tool wrappers (PsiPyUtils) of the Build package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Build"))
+from LogArchive import LogArchive
+
+
+class TestLogArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.archive = LogArchive(self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_QueryReturnsIndexedLines(self):
+        name = self.archive.Write("build.log", "foo\nWARNING:Xst:2042 - a\nINFO:Xst:1 - b\nWARNING:Xst:2042 - c\n")
+        self.assertEqual([(name, 1, "WARNING:Xst:2042 - a"), (name, 3, "WARNING:Xst:2042 - c")],
+                         self.archive.Query("WARNING:Xst:2042"))
+        self.assertEqual({name : [2]}, self.archive.FindLogs("INFO:Xst:1"))
+        self.assertEqual([], self.archive.Query("ERROR:Xst:1"))
+
+    def test_SpecialLineBreakCharacters(self):
+        content = "line0\nheader\x0cpage\x0b\x1c\x1d\x1e\x85 x\nWARNING:Xst:2042 - a\r\nfoo\nWARNING:Xst:2042 - b\n"
+        name = self.archive.Write("build.log", content)
+        self.assertEqual([(name, 2, "WARNING:Xst:2042 - a"), (name, 4, "WARNING:Xst:2042 - b")],
+                         self.archive.Query("WARNING:Xst:2042"))
+        self.assertEqual(content, self.archive.ReadLog(name))
+
+    def test_UniqueNamesAndFilter(self):
+        nameA = self.archive.Write("a.log", "WARNING:Xst:1 - a")
+        nameB = self.archive.Write("b.log", "WARNING:Xst:1 - b")
+        self.assertNotEqual(nameA, nameB)
+        self.assertEqual([(nameB, 0, "WARNING:Xst:1 - b")], self.archive.Query("WARNING:Xst:1", logFilter=".*b\\.log"))
+
+
+if __name__ == "__main__":
+    unittest.main()
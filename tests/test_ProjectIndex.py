@@ -0,0 +1,67 @@
+##############################################################################
+#  Copyright (c) 2018 by Paul Scherrer Institute, Switzerland
+#  All rights reserved.
+#  Authors: Oliver Bruendler
+##############################################################################
+import os
+import sys
+import types
+import shutil
+import tempfile
+import unittest
+
+#ProjectIndex is pure python, load the Build package without executing its __init__ (the tool wrappers imported there
+#depend on PsiPyUtils)
+if "Build" not in sys.modules:
+    buildPkg = types.ModuleType("Build")
+    buildPkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Build")]
+    sys.modules["Build"] = buildPkg
+from Build.ProjectIndex import ProjectIndex
+
+
+class TestProjectIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.pcoreDir = self._Path("edk", "pcores", "my_core_v1_00_a")
+        self._Write(self._Path("edk", "system.xmp"), "XmpVersion: 14.7\nMHS File: system.mhs\nUcfFile: data/system.ucf\n")
+        self._Write(self._Path("edk", "system.mhs"),
+                    "BEGIN my_core\n PARAMETER INSTANCE = my_core_0\n PARAMETER HW_VER = 1.00.a\nEND\n")
+        self._Write(os.path.join(self.pcoreDir, "data", "my_core_v2_1_0.pao"), "lib my_core_v1_00_a a vhdl\n")
+        self._Write(os.path.join(self.pcoreDir, "hdl", "vhdl", "a.vhd"), "")
+        self.xmp = self._Path("edk", "system.xmp")
+        self.index = ProjectIndex(self._Path("index.json"))
+        self.index.AddProject(self.xmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_AffectedByPcoreAndUcf(self):
+        expected = [ProjectIndex._NormPath(self.xmp)]
+        self.assertEqual(expected, self.index.GetAffectedProjects([os.path.join(self.pcoreDir, "hdl", "vhdl", "a.vhd")]))
+        self.assertEqual(expected, self.index.GetAffectedProjects([self._Path("edk", "data", "system.ucf")]))
+        self.assertEqual([], self.index.GetAffectedProjects([self._Path("other.vhd")]))
+
+    def test_FileAddedToPcore(self):
+        newFile = os.path.join(self.pcoreDir, "hdl", "vhdl", "b.vhd")
+        self._Write(newFile, "")
+        self._Write(os.path.join(self.pcoreDir, "data", "my_core_v2_1_0.pao"),
+                    "lib my_core_v1_00_a a vhdl\nlib my_core_v1_00_a b vhdl\n")
+        self.assertEqual([ProjectIndex._NormPath(self.xmp)], self.index.GetAffectedProjects([newFile]))
+        #The updated index is persistent after Save()
+        self.index.Save()
+        self.assertEqual([ProjectIndex._NormPath(self.xmp)],
+                         ProjectIndex(self._Path("index.json")).GetAffectedProjects([newFile]))
+
+    def _Path(self, *parts):
+        return os.path.join(self.dir, *parts)
+
+    @staticmethod
+    def _Write(path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w+") as f:
+            f.write(content)
+
+
+if __name__ == "__main__":
+    unittest.main()